@@ -1,5 +1,6 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 import logging
 import os
@@ -23,6 +24,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress the large nested OCR/NER JSON responses for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Initialize ML Pipeline Components
 UNIFIED_PIPELINE_AVAILABLE = False
 unified_ocr_pipeline = None
@@ -35,6 +39,11 @@ try:
     # Initialize the advanced pipeline
     unified_ocr_pipeline = UnifiedOCRPipeline()
     medical_processor = MedicalContextProcessor()
+    
+    # Run one short text through NER at startup so the first prescription
+    # doesn't pay for spaCy's lazy setup and regex compilation
+    if medical_processor.enhanced_ner:
+        medical_processor.enhanced_ner.extract_medical_entities("Paracetamol 500mg twice daily for 5 days")
     UNIFIED_PIPELINE_AVAILABLE = True
     logger.info("✅ Advanced ML Pipeline initialized successfully!")
     
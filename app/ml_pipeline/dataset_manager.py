@@ -5,6 +5,7 @@ Handles IAM Words dataset and custom medical datasets
 """
 
 import os
+import gzip
 import requests
 import zipfile
 import xml.etree.ElementTree as ET
@@ -32,6 +33,7 @@ class DatasetManager:
         # Database for medical terms
         self.medical_db_path = self.data_dir / "medical_terms.db"
         self._init_medical_database()
+        self._vocabulary_cache = None
     
     def _init_medical_database(self):
         """Initialize medical terms database with Indian pharmaceutical data"""
@@ -84,7 +86,10 @@ class DatasetManager:
         logger.info("Medical database initialized with Indian pharmaceutical terms")
     
     def get_medical_vocabulary(self) -> Dict[str, Dict]:
-        """Get medical vocabulary with metadata"""
+        """Get medical vocabulary with metadata (loaded once per manager)"""
+        if self._vocabulary_cache is not None:
+            return self._vocabulary_cache
+        
         conn = sqlite3.connect(self.medical_db_path)
         cursor = conn.cursor()
         
@@ -100,5 +105,16 @@ class DatasetManager:
             }
         
         conn.close()
+        self._vocabulary_cache = vocabulary
         return vocabulary
-
+    
+    def load_samples(self, samples_file: Optional[str] = None) -> List[Dict]:
+        """Load synthetic sample metadata from .json or .json.gz"""
+        if samples_file is None:
+            compressed = self.data_dir / "medical_samples.json.gz"
+            samples_file = compressed if compressed.exists() else self.data_dir / "medical_samples.json"
+        samples_file = Path(samples_file)
+        
+        opener = gzip.open if samples_file.suffix == '.gz' else open
+        with opener(samples_file, 'rt', encoding='utf-8') as f:
+            return json.load(f)
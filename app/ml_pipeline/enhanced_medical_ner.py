@@ -5,8 +5,8 @@ import logging
 import sqlite3
 from typing import Dict, List, Tuple, Any, Optional, Set
 from difflib import SequenceMatcher
-import spacy
 from spacy.matcher import Matcher, PhraseMatcher
+from .enhanced_medical_ner_utils import load_spacy_model
 
 logger = logging.getLogger(__name__)
 
@@ -85,7 +85,7 @@ class EnhancedMedicalNER:
         """Initialize spaCy and medSpaCy models"""
         try:
         
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = load_spacy_model("en_core_web_sm")
             logger.info("Loaded spaCy English model")
             
        
@@ -333,7 +333,10 @@ class EnhancedMedicalNER:
                 'confidence_scores': {}
             }
 
-            
+            # Blank OCR output has nothing to extract; skip every pass
+            if not text or not text.strip():
+                return self._normalize_entities(entities)
+
             if self.nlp:
                 spacy_entities = self._extract_with_spacy(text)
                 entities = self._merge_entities(entities, spacy_entities)
@@ -600,11 +603,16 @@ class EnhancedMedicalNER:
                     entities[entity_type] = unique_entities
             return entities
 
-    def extract_structured_prescription_data(self, text: str) -> Dict[str, Any]:
-        """Extract structured prescription data with normalized drug information"""
+    def extract_structured_prescription_data(self, text: str, entities: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Extract structured prescription data with normalized drug information
+
+        Pass ``entities`` from a prior extract_medical_entities call on the same
+        text to skip running the extraction pipeline a second time.
+        """
         try:
           
-            entities = self.extract_medical_entities(text)
+            if entities is None:
+                entities = self.extract_medical_entities(text)
 
           
             structured_data = {
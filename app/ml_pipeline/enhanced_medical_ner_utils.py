@@ -5,7 +5,10 @@ Contains fuzzy matching, regex extraction, and normalization functions
 
 import re
 import logging
+import functools
 from typing import Dict, List, Tuple, Any, Optional
+import numpy as np
+import spacy
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,16 @@ try:
 except ImportError:
     RAPIDFUZZ_AVAILABLE = False
 
+@functools.lru_cache(maxsize=None)
+def load_spacy_model(name: str = "en_core_web_sm"):
+    """Load a spaCy pipeline once per process and share it between components"""
+    return spacy.load(name)
+
+@functools.lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """Compile an entity pattern once; callers keep passing the raw string"""
+    return re.compile(pattern, re.IGNORECASE)
+
 def extract_with_regex(text: str, patterns: Dict[str, List[str]]) -> Dict[str, Any]:
     """Extract medical entities using regex patterns"""
     entities = {
@@ -31,7 +44,7 @@ def extract_with_regex(text: str, patterns: Dict[str, List[str]]) -> Dict[str, A
         
         # Extract dosages
         for pattern in patterns.get('dosage_patterns', []):
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
+            matches = _compile_pattern(pattern).finditer(text_lower)
             for match in matches:
                 entities['dosages'].append({
                     'text': match.group(),
@@ -44,7 +57,7 @@ def extract_with_regex(text: str, patterns: Dict[str, List[str]]) -> Dict[str, A
         
         # Extract frequencies
         for pattern in patterns.get('frequency_patterns', []):
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
+            matches = _compile_pattern(pattern).finditer(text_lower)
             for match in matches:
                 entities['frequencies'].append({
                     'text': match.group(),
@@ -57,7 +70,7 @@ def extract_with_regex(text: str, patterns: Dict[str, List[str]]) -> Dict[str, A
         
         # Extract durations
         for pattern in patterns.get('duration_patterns', []):
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
+            matches = _compile_pattern(pattern).finditer(text_lower)
             for match in matches:
                 entities['durations'].append({
                     'text': match.group(),
@@ -70,7 +83,7 @@ def extract_with_regex(text: str, patterns: Dict[str, List[str]]) -> Dict[str, A
         
         # Extract instructions
         for pattern in patterns.get('instruction_patterns', []):
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
+            matches = _compile_pattern(pattern).finditer(text_lower)
             for match in matches:
                 entities['instructions'].append({
                     'text': match.group(),
@@ -117,17 +130,19 @@ def extract_with_fuzzy_matching(text: str, drug_database: Dict[str, Dict[str, An
         
         # Split text into words and phrases
         words = text.split()
+        cutoff = threshold * 100  # rapidfuzz returns 0-100 scale
         
-        # Check individual words
-        for word in words:
-            if len(word) < 3:  # Skip very short words
-                continue
+        # Score every candidate against every drug name in one native cdist
+        # call instead of a Python-level process.extract per candidate
+        candidate_words = [word for word in words if len(word) >= 3]  # Skip very short words
+        if candidate_words:
+            scores = process.cdist(candidate_words, drug_names, scorer=fuzz.ratio,
+                                   score_cutoff=cutoff, dtype=np.float64)
             
-            # Find best matches
-            matches = process.extract(word, drug_names, scorer=fuzz.ratio, limit=3)
-            
-            for match_text, score, _ in matches:
-                if score >= threshold * 100:  # rapidfuzz returns 0-100 scale
+            for word, row in zip(candidate_words, scores):
+                for index in _top_matches(row, 3, cutoff):
+                    match_text = drug_names[index]
+                    score = float(row[index])
                     drug_key, drug_info, match_type = drug_mapping[match_text]
                     
                     entities['medications'].append({
@@ -141,33 +156,45 @@ def extract_with_fuzzy_matching(text: str, drug_database: Dict[str, Dict[str, An
                     })
         
         # Check 2-word and 3-word phrases
+        phrases = []
         for i in range(len(words) - 1):
             phrase2 = ' '.join(words[i:i+2])
             phrase3 = ' '.join(words[i:i+3]) if i < len(words) - 2 else None
             
             for phrase in [phrase2, phrase3]:
                 if phrase and len(phrase) > 5:
-                    matches = process.extract(phrase, drug_names, scorer=fuzz.partial_ratio, limit=2)
+                    phrases.append(phrase)
+        
+        if phrases:
+            scores = process.cdist(phrases, drug_names, scorer=fuzz.partial_ratio,
+                                   score_cutoff=cutoff, dtype=np.float64)
+            
+            for phrase, row in zip(phrases, scores):
+                for index in _top_matches(row, 2, cutoff):
+                    match_text = drug_names[index]
+                    score = float(row[index])
+                    drug_key, drug_info, match_type = drug_mapping[match_text]
                     
-                    for match_text, score, _ in matches:
-                        if score >= threshold * 100:
-                            drug_key, drug_info, match_type = drug_mapping[match_text]
-                            
-                            entities['medications'].append({
-                                'text': phrase,
-                                'matched_drug': match_text,
-                                'generic_name': drug_info['generic_name'],
-                                'category': drug_info['category'],
-                                'confidence': score / 100.0,
-                                'method': 'rapidfuzz_phrase',
-                                'match_type': match_type
-                            })
+                    entities['medications'].append({
+                        'text': phrase,
+                        'matched_drug': match_text,
+                        'generic_name': drug_info['generic_name'],
+                        'category': drug_info['category'],
+                        'confidence': score / 100.0,
+                        'method': 'rapidfuzz_phrase',
+                        'match_type': match_type
+                    })
     
     except Exception as e:
         logger.warning(f"Fuzzy matching failed: {e}")
     
     return entities
 
+def _top_matches(scores: np.ndarray, limit: int, cutoff: float) -> List[int]:
+    """Indices of the best ``limit`` scores at or above ``cutoff``, like process.extract"""
+    best = np.argsort(-scores, kind='stable')[:limit]
+    return [int(index) for index in best if scores[index] >= cutoff]
+
 def _extract_with_basic_fuzzy(text: str, drug_database: Dict[str, Dict[str, Any]], threshold: float = 0.8) -> Dict[str, Any]:
     """Basic fuzzy matching using difflib when rapidfuzz is not available"""
     from difflib import SequenceMatcher
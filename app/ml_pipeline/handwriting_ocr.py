@@ -2,11 +2,13 @@
 Enhanced Handwriting Recognition Engine for Medical Prescriptions
 Supports handwritten text extraction using TrOCR and EasyOCR
 """
+import os
 import cv2
 import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import re
-from typing import Dict, List, Tuple, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Any, Optional, Union
 import logging
 import warnings
 
@@ -44,7 +46,6 @@ warnings.filterwarnings("ignore")
 # Import handwriting specialist
 try:
     import sys
-    import os
     sys.path.append(os.path.dirname(__file__))
     from handwriting_specialist import HandwritingSpecialist
     HANDWRITING_SPECIALIST_AVAILABLE = True
@@ -55,6 +56,16 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Threads used to run the preprocessing variants; set to 1 to process them serially
+try:
+    HANDWRITING_OCR_WORKERS = max(1, int(os.getenv("HANDWRITING_OCR_WORKERS", "4")))
+except ValueError:
+    logger.warning(f"Invalid HANDWRITING_OCR_WORKERS={os.getenv('HANDWRITING_OCR_WORKERS')!r}, using 4")
+    HANDWRITING_OCR_WORKERS = 4
+
+# Quantize TrOCR's linear layers to int8 when running on CPU; set to 0 to keep fp32
+TROCR_QUANTIZE = os.getenv("TROCR_QUANTIZE", "1") != "0"
+
 class HandwritingRecognitionEngine:
     def __init__(self):
         """Initialize handwriting recognition models"""
@@ -111,12 +122,22 @@ class HandwritingRecognitionEngine:
                     self.trocr_model = VisionEncoderDecoderModel.from_pretrained(model_name)
                     self.trocr_model.to(self.device)
                     self.trocr_model.eval()
-                    logger.info(f"TrOCR model loaded successfully: {model_name}")
-                    break
                 except Exception as e:
                     logger.warning(f"Failed to load {model_name}: {e}")
                     continue
 
+                logger.info(f"TrOCR model loaded successfully: {model_name}")
+                if TROCR_QUANTIZE and self.device.type == "cpu":
+                    # A quantization failure must not demote us to the fallback model
+                    try:
+                        self.trocr_model = torch.quantization.quantize_dynamic(
+                            self.trocr_model, {torch.nn.Linear}, dtype=torch.qint8
+                        )
+                        logger.info("Quantized TrOCR linear layers to int8 for CPU inference")
+                    except Exception as e:
+                        logger.warning(f"TrOCR quantization failed, keeping fp32 model: {e}")
+                break
+
             if self.trocr_model is None:
                 logger.error("Failed to load any TrOCR model")
 
@@ -162,18 +183,23 @@ class HandwritingRecognitionEngine:
             'as', 'needed', 'required', 'directed', 'prescribed'
         ]
     
-    def preprocess_for_handwriting(self, image_path: str) -> List[np.ndarray]:
-        """Enhanced preprocessing specifically for handwritten text"""
+    def preprocess_for_handwriting(self, image: Union[str, np.ndarray]) -> List[np.ndarray]:
+        """Enhanced preprocessing specifically for handwritten text
+
+        Accepts an image path or an already decoded image, so callers that
+        have decoded the file once can share the array instead of re-reading it.
+        """
         try:
-            # Read image
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError(f"Could not read image: {image_path}")
+            if isinstance(image, np.ndarray):
+                gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            else:
+                # Read image directly as grayscale
+                gray = cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+                if gray is None:
+                    raise ValueError(f"Could not read image: {image}")
             
             variants = []
             
-            # Convert to grayscale
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
             variants.append(gray)
             
             # Enhance contrast for handwriting
@@ -221,13 +247,16 @@ class HandwritingRecognitionEngine:
         try:
             # Variant 1: Gamma correction for better contrast
             gamma_corrected = exposure.adjust_gamma(gray, gamma=1.2)
-            variants.append(gamma_corrected.astype(np.uint8))
+            variants.append(gamma_corrected.astype(np.uint8, copy=False))
 
             # Variant 2: Unsharp masking for text sharpening
+            # (computed in place to avoid extra full-size float64 temporaries)
             blurred = filters.gaussian(gray, sigma=1.0)
-            unsharp = gray + 0.6 * (gray - blurred)
-            unsharp = np.clip(unsharp, 0, 255).astype(np.uint8)
-            variants.append(unsharp)
+            unsharp = gray - blurred
+            unsharp *= 0.6
+            unsharp += gray
+            np.clip(unsharp, 0, 255, out=unsharp)
+            variants.append(unsharp.astype(np.uint8))
 
             # Variant 3: Top-hat transform for text enhancement
             selem = morphology.disk(2)
@@ -236,7 +265,8 @@ class HandwritingRecognitionEngine:
 
             # Variant 4: Adaptive histogram equalization
             equalized = exposure.equalize_adapthist(gray, clip_limit=0.03)
-            variants.append((equalized * 255).astype(np.uint8))
+            equalized *= 255
+            variants.append(equalized.astype(np.uint8))
 
         except Exception as e:
             logger.warning(f"Failed to create advanced preprocessing variants: {e}")
@@ -305,6 +335,36 @@ class HandwritingRecognitionEngine:
             logger.error(f"TrOCR extraction failed: {e}")
             return "", 0.0
     
+    def extract_handwritten_text_trocr_batch(self, images: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """Extract handwritten text from several images with one batched TrOCR pass"""
+        try:
+            if self.trocr_processor is None or self.trocr_model is None or not images:
+                return [("", 0.0)] * len(images)
+            
+            pil_images = [
+                Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB)) if len(image.shape) == 3
+                else Image.fromarray(image).convert('RGB')
+                for image in images
+            ]
+            
+            # The processor resizes every image to the model's input size, so
+            # variants of any shape stack into a single batch
+            pixel_values = self.trocr_processor(pil_images, return_tensors="pt").pixel_values.to(self.device)
+            
+            with torch.inference_mode():
+                if self.device.type == "cuda" and torch.cuda.is_bf16_supported():
+                    with torch.autocast("cuda", dtype=torch.bfloat16):
+                        generated_ids = self.trocr_model.generate(pixel_values, max_length=100)
+                else:
+                    generated_ids = self.trocr_model.generate(pixel_values, max_length=100)
+                generated_texts = self.trocr_processor.batch_decode(generated_ids, skip_special_tokens=True)
+            
+            return [(text.strip(), self._calculate_text_confidence(text)) for text in generated_texts]
+            
+        except Exception as e:
+            logger.error(f"Batched TrOCR extraction failed: {e}")
+            return [("", 0.0)] * len(images)
+    
     def extract_handwritten_text_easyocr(self, image: np.ndarray) -> Tuple[str, float]:
         """Extract handwritten text using EasyOCR"""
         try:
@@ -362,54 +422,29 @@ class HandwritingRecognitionEngine:
         
         return min(score, 1.0)
     
-    def process_handwritten_prescription(self, image_path: str) -> Dict[str, Any]:
-        """Main function to process handwritten prescription"""
+    def process_handwritten_prescription(self, image: Union[str, np.ndarray]) -> Dict[str, Any]:
+        """Main function to process handwritten prescription (image path or decoded image)"""
         try:
-            logger.info(f"Processing handwritten prescription: {image_path}")
+            source = image if isinstance(image, str) else f"decoded image {image.shape}"
+            logger.info(f"Processing handwritten prescription: {source}")
             
             # Preprocess image for handwriting
-            image_variants = self.preprocess_for_handwriting(image_path)
+            image_variants = self.preprocess_for_handwriting(image)
             
             if not image_variants:
                 return self._create_error_response("Could not preprocess image for handwriting")
             
-            # Extract text using multiple methods
+            # TrOCR reads all variants in one batched forward pass
+            trocr_results = self.extract_handwritten_text_trocr_batch(image_variants)
+            
+            # Extract text using multiple methods. Variants are independent and
+            # the OCR backends release the GIL, so they run on a thread pool;
+            # map keeps the results in variant order
             all_results = []
             
-            for i, variant in enumerate(image_variants):
-                # Try Handwriting Specialist first (most specialized)
-                if self.handwriting_specialist:
-                    logger.info(f"Using handwriting specialist for variant {i+1}")
-                    specialist_result = self.handwriting_specialist.extract_handwritten_text(variant)
-                    logger.info(f"Handwriting specialist result: success={specialist_result['success']}, medications={len(specialist_result.get('medications', []))}")
-                    if specialist_result['success']:
-                        all_results.append({
-                            'method': f'HandwritingSpecialist_variant_{i+1}',
-                            'text': specialist_result['text'],
-                            'confidence': specialist_result['confidence'],
-                            'medications': specialist_result.get('medications', []),
-                            'instructions': specialist_result.get('instructions', [])
-                        })
-                else:
-                    logger.warning("Handwriting specialist not available for processing")
-
-                # Try TrOCR
-                trocr_text, trocr_conf = self.extract_handwritten_text_trocr(variant)
-                if trocr_text:
-                    all_results.append({
-                        'method': f'TrOCR_variant_{i+1}',
-                        'text': trocr_text,
-                        'confidence': trocr_conf
-                    })
-
-                # Try EasyOCR
-                easyocr_text, easyocr_conf = self.extract_handwritten_text_easyocr(variant)
-                if easyocr_text:
-                    all_results.append({
-                        'method': f'EasyOCR_variant_{i+1}',
-                        'text': easyocr_text,
-                        'confidence': easyocr_conf
-                    })
+            with ThreadPoolExecutor(max_workers=HANDWRITING_OCR_WORKERS) as executor:
+                for variant_results in executor.map(self._process_variant, range(1, len(image_variants) + 1), image_variants, trocr_results):
+                    all_results.extend(variant_results)
             
             if not all_results:
                 return self._create_error_response("No handwritten text extracted")
@@ -435,6 +470,46 @@ class HandwritingRecognitionEngine:
             logger.error(f"Handwriting processing failed: {e}")
             return self._create_error_response(f"Handwriting processing error: {str(e)}")
     
+    def _process_variant(self, variant_number: int, variant: np.ndarray, trocr_result: Tuple[str, float]) -> List[Dict]:
+        """Run every available handwriting recognizer on one preprocessed variant"""
+        results = []
+        
+        # Try Handwriting Specialist first (most specialized)
+        if self.handwriting_specialist:
+            logger.info(f"Using handwriting specialist for variant {variant_number}")
+            specialist_result = self.handwriting_specialist.extract_handwritten_text(variant)
+            logger.info(f"Handwriting specialist result: success={specialist_result['success']}, medications={len(specialist_result.get('medications', []))}")
+            if specialist_result['success']:
+                results.append({
+                    'method': f'HandwritingSpecialist_variant_{variant_number}',
+                    'text': specialist_result['text'],
+                    'confidence': specialist_result['confidence'],
+                    'medications': specialist_result.get('medications', []),
+                    'instructions': specialist_result.get('instructions', [])
+                })
+        else:
+            logger.warning("Handwriting specialist not available for processing")
+
+        # TrOCR result comes from the batched pass over all variants
+        trocr_text, trocr_conf = trocr_result
+        if trocr_text:
+            results.append({
+                'method': f'TrOCR_variant_{variant_number}',
+                'text': trocr_text,
+                'confidence': trocr_conf
+            })
+
+        # Try EasyOCR
+        easyocr_text, easyocr_conf = self.extract_handwritten_text_easyocr(variant)
+        if easyocr_text:
+            results.append({
+                'method': f'EasyOCR_variant_{variant_number}',
+                'text': easyocr_text,
+                'confidence': easyocr_conf
+            })
+        
+        return results
+    
     def _combine_handwriting_results(self, results: List[Dict]) -> str:
         """Intelligently combine handwriting recognition results"""
         if not results:
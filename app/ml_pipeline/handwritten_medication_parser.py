@@ -14,6 +14,17 @@ logger = logging.getLogger(__name__)
 class HandwrittenMedicationParser:
     """Specialized parser for handwritten medication names"""
     
+    # Upper bound on cached word lookups; OCR noise makes the word set unbounded
+    MATCH_CACHE_SIZE = 4096
+    
+    # Regexes are compiled once per process rather than on every call
+    DOSAGE_PATTERNS = tuple(
+        re.compile(pattern, re.IGNORECASE)
+        for pattern in (r'\d+\s*mg', r'\d+\s*ml', r'\d+\s*%', r'\d+\s*gm', r'\d+\s*g')
+    )
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+    ARTIFACT_PATTERN = re.compile(r'[^\w\s\.\-\%\/]')
+    
     def __init__(self):
         """Initialize the medication parser"""
         
@@ -96,14 +107,8 @@ class HandwrittenMedicationParser:
             'drops': ['drops', 'drp', 'drop']
         }
         
-        # Dosage patterns
-        self.dosage_patterns = [
-            r'\d+\s*mg',
-            r'\d+\s*ml',
-            r'\d+\s*%',
-            r'\d+\s*gm',
-            r'\d+\s*g'
-        ]
+        # Dosage patterns (per-instance list; the compiled patterns are shared and immutable)
+        self.dosage_patterns = list(self.DOSAGE_PATTERNS)
         
         # Frequency patterns
         self.frequency_patterns = {
@@ -115,6 +120,9 @@ class HandwrittenMedicationParser:
             'x': 'times',
             'rf': 'as required'
         }
+        
+        # Cache of word -> medication match results
+        self._match_cache: Dict[str, Optional[Tuple[str, Dict]]] = {}
     
     def parse_handwritten_medications(self, text: str) -> List[Dict]:
         """Parse handwritten medications from OCR text"""
@@ -153,10 +161,10 @@ class HandwrittenMedicationParser:
             text = text.replace(error, correction)
         
         # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = self.WHITESPACE_PATTERN.sub(' ', text)
         
         # Fix common OCR artifacts
-        text = re.sub(r'[^\w\s\.\-\%\/]', ' ', text)
+        text = self.ARTIFACT_PATTERN.sub(' ', text)
         
         return text
     
@@ -199,8 +207,24 @@ class HandwrittenMedicationParser:
     
     def _find_medication_match(self, word: str) -> Optional[Tuple[str, Dict]]:
         """Find if a word matches a known medication"""
-        word_lower = word.lower()
+        word_lower = word.lower().strip()
         
+        # Words repeat across lines and prescriptions; fuzzy matching is the expensive part
+        try:
+            return self._match_cache[word_lower]
+        except KeyError:
+            pass
+
+        # The parser is shared by the handwriting variant threads, so never read
+        # back from the cache: another thread may clear it in between
+        result = self._lookup_medication(word_lower)
+        if len(self._match_cache) >= self.MATCH_CACHE_SIZE:
+            self._match_cache.clear()
+        self._match_cache[word_lower] = result
+        return result
+    
+    def _lookup_medication(self, word_lower: str) -> Optional[Tuple[str, Dict]]:
+        """Match a lowercased word against the medication database"""
         # Direct match
         if word_lower in self.medication_database:
             return (word_lower, self.medication_database[word_lower])
@@ -244,7 +268,7 @@ class HandwrittenMedicationParser:
             
             # Check for dosage patterns
             for pattern in self.dosage_patterns:
-                if re.search(pattern, next_word, re.IGNORECASE):
+                if pattern.search(next_word):
                     return True
         
         return False
@@ -276,7 +300,7 @@ class HandwrittenMedicationParser:
             
             # Extract dosage
             for pattern in self.dosage_patterns:
-                match = re.search(pattern, context_text, re.IGNORECASE)
+                match = pattern.search(context_text)
                 if match:
                     medication['dosage'] = match.group()
                     break
@@ -330,7 +354,7 @@ class HandwrittenMedicationParser:
         # If no specific dosage found, look for patterns
         if not medication['dosage']:
             for pattern in self.dosage_patterns:
-                match = re.search(pattern, context, re.IGNORECASE)
+                match = pattern.search(context)
                 if match:
                     medication['dosage'] = match.group()
                     break
@@ -7,8 +7,8 @@ import json
 from typing import Dict, List, Tuple, Any, Optional
 import logging
 from difflib import SequenceMatcher
-import spacy
 from spacy.matcher import Matcher
+from .enhanced_medical_ner_utils import load_spacy_model
 
 # Import enhanced medical NER
 try:
@@ -53,7 +53,7 @@ class MedicalContextProcessor:
         """Initialize spaCy NLP model"""
         try:
             # Try to load English model
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = load_spacy_model("en_core_web_sm")
             logger.info("Loaded spaCy English model")
         except OSError:
             logger.warning("spaCy English model not found. Medical NER will be limited.")
@@ -479,14 +479,14 @@ class MedicalContextProcessor:
                 logger.info("Using Enhanced Medical NER for entity extraction")
 
                 try:
-                    # Extract structured prescription data
-                    enhanced_structured_data = self.enhanced_ner.extract_structured_prescription_data(main_text)
-                    logger.debug(f"Enhanced structured data: {type(enhanced_structured_data)}")
-
-                    # Extract basic entities for compatibility
+                    # Extract entities once and structure them, rather than
+                    # running the NER pipeline again for the structured view
                     entities = self.enhanced_ner.extract_medical_entities(main_text)
                     logger.debug(f"Enhanced entities: {type(entities)}")
 
+                    enhanced_structured_data = self.enhanced_ner.extract_structured_prescription_data(main_text, entities)
+                    logger.debug(f"Enhanced structured data: {type(enhanced_structured_data)}")
+
                     # Convert enhanced format to legacy format for compatibility
                     entities = self._convert_enhanced_to_legacy_format(entities, enhanced_structured_data)
 
@@ -65,14 +65,19 @@ class MedicalDatasetCreator:
     def create_synthetic_samples(self, num_samples: int = 1000) -> List[Dict]:
         """Generate synthetic handwritten medical samples"""
         samples = []
+        categories = list(self.medical_terms.keys())
+        # Terms repeat across samples, so compute each term's variations once
+        variations_by_term = {}
         
         for i in range(num_samples):
             # Select random medical term
-            category = random.choice(list(self.medical_terms.keys()))
+            category = random.choice(categories)
             term = random.choice(self.medical_terms[category])
             
             # Add variations and common misspellings
-            variations = self._generate_variations(term)
+            variations = variations_by_term.get(term)
+            if variations is None:
+                variations = variations_by_term[term] = self._generate_variations(term)
             
             for variation in variations[:2]:  # Limit variations
                 sample = self._create_handwritten_sample(variation, category)
@@ -7,7 +7,7 @@ import numpy as np
 from PIL import Image
 import paddleocr
 import re
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, Union
 import logging
 import json
 
@@ -227,16 +227,16 @@ class MultilingualOCREngine:
             }
         }
 
-    def preprocess_for_multilingual(self, image_path: str) -> np.ndarray:
-        """Enhanced preprocessing for multi-language text"""
+    def preprocess_for_multilingual(self, image: Union[str, np.ndarray]) -> np.ndarray:
+        """Enhanced preprocessing for multi-language text (image path or decoded image)"""
         try:
-            # Read image
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError(f"Could not read image: {image_path}")
-
-            # Convert to grayscale
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            if isinstance(image, np.ndarray):
+                gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            else:
+                # Read image directly as grayscale
+                gray = cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+                if gray is None:
+                    raise ValueError(f"Could not read image: {image}")
 
             # Noise reduction
             denoised = cv2.fastNlMeansDenoising(gray)
@@ -325,11 +325,11 @@ class MultilingualOCREngine:
                 text_lines.append(text)
         return '\n'.join(text_lines)
 
-    def extract_multilingual_text(self, image_path: str) -> Dict[str, Any]:
-        """Extract text using multiple language OCR engines"""
+    def extract_multilingual_text(self, image: Union[str, np.ndarray]) -> Dict[str, Any]:
+        """Extract text using multiple language OCR engines (image path or decoded image)"""
         try:
             # Preprocess image
-            processed_img = self.preprocess_for_multilingual(image_path)
+            processed_img = self.preprocess_for_multilingual(image)
             if processed_img is None:
                 return self._create_error_response("Image preprocessing failed")
 
@@ -25,14 +25,11 @@ class EnhancedOCREngine:
         
     def preprocess_image(self, image_path: str) -> np.ndarray:
         """Enhanced image preprocessing for better OCR"""
-        # Read image
-        img = cv2.imread(image_path)
-        if img is None:
+        # Read image directly as grayscale
+        gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
             raise ValueError(f"Could not read image: {image_path}")
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
         # Noise reduction
         denoised = cv2.fastNlMeansDenoising(gray)
         
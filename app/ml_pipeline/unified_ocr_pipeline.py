@@ -6,7 +6,7 @@ import cv2
 import numpy as np
 from PIL import Image
 import logging
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, Union
 import json
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -113,11 +113,12 @@ class UnifiedOCRPipeline:
             logger.error(f"Failed to initialize OCR engines: {e}")
             raise
     
-    def detect_prescription_type(self, image_path: str) -> Dict[str, Any]:
+    def detect_prescription_type(self, image_path: str, img: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Detect the type of prescription (printed, handwritten, mixed)"""
         try:
-            # Read and analyze image
-            img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            # Read and analyze image, unless the caller already decoded it
+            if img is None:
+                img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
             if img is None:
                 return {'type': 'unknown', 'confidence': 0.0, 'features': {}}
             
@@ -282,15 +283,23 @@ class UnifiedOCRPipeline:
         else:  # mixed
             return ['printed_text', 'multilingual', 'handwriting']
     
-    def process_prescription_comprehensive(self, image_path: str, mode: str = 'standard') -> Dict[str, Any]:
-        """Process prescription using comprehensive OCR pipeline"""
+    def process_prescription_comprehensive(self, image: Union[str, np.ndarray], mode: str = 'standard') -> Dict[str, Any]:
+        """Process prescription using comprehensive OCR pipeline (image path or decoded image)"""
         start_time = time.time()
         
         try:
-            logger.info(f"Starting comprehensive OCR processing: {image_path}")
+            source = image if isinstance(image, str) else f"decoded image {image.shape}"
+            logger.info(f"Starting comprehensive OCR processing: {source}")
+            
+            # Decode once; type detection and every engine share the array
+            if isinstance(image, np.ndarray):
+                gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            else:
+                gray = cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+            image_input = gray if gray is not None else image
             
             # Step 1: Detect prescription type
-            type_detection = self.detect_prescription_type(image_path)
+            type_detection = self.detect_prescription_type(image if isinstance(image, str) else "", gray)
             logger.info(f"Detected prescription type: {type_detection['type']} (confidence: {type_detection['confidence']:.2f})")
             
             # Step 2: Determine which engines to use
@@ -310,13 +319,13 @@ class UnifiedOCRPipeline:
                 
                 if 'printed_text' in engines_to_use and self.printed_text_engine:
                     logger.info("Starting printed_text engine")
-                    future = executor.submit(self.printed_text_engine.process_prescription, image_path)
+                    future = executor.submit(self.printed_text_engine.process_prescription, image_input)
                     future_to_engine[future] = 'printed_text'
 
                 if 'multilingual' in engines_to_use and self.multilingual_engine:
                     logger.info("Starting multilingual engine")
                     try:
-                        future = executor.submit(self.multilingual_engine.extract_multilingual_text, image_path)
+                        future = executor.submit(self.multilingual_engine.extract_multilingual_text, image_input)
                         future_to_engine[future] = 'multilingual'
                     except Exception as e:
                         logger.warning(f"Failed to start multilingual engine: {e}")
@@ -324,7 +333,7 @@ class UnifiedOCRPipeline:
 
                 if 'handwriting' in engines_to_use and self.handwriting_engine:
                     logger.info("Starting handwriting engine")
-                    future = executor.submit(self.handwriting_engine.process_handwritten_prescription, image_path)
+                    future = executor.submit(self.handwriting_engine.process_handwritten_prescription, image_input)
                     future_to_engine[future] = 'handwriting'
                 
                 # Collect results
@@ -342,7 +351,7 @@ class UnifiedOCRPipeline:
                 if 'handwriting' not in results and 'handwriting' in engines_to_use and self.handwriting_engine:
                     logger.info("Handwriting engine not in results, running directly...")
                     try:
-                        handwriting_result = self.handwriting_engine.process_handwritten_prescription(image_path)
+                        handwriting_result = self.handwriting_engine.process_handwritten_prescription(image_input)
                         results['handwriting'] = handwriting_result
                         logger.info("Direct handwriting processing completed")
                     except Exception as e:
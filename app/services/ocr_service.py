@@ -1,9 +1,12 @@
+import os
+import tempfile
 import cv2
 import numpy as np
 import pytesseract
 from PIL import Image, ImageEnhance, ImageFilter
 import re
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Union
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,19 +14,33 @@ logger = logging.getLogger(__name__)
 class EnhancedPrescriptionOCR:
     def __init__(self):
         self.confidence_threshold = 0.6
+        # Longest image side fed to Tesseract; larger scans are downscaled
+        self.max_image_side = 2048
+    
+    def _limit_size(self, gray: np.ndarray) -> np.ndarray:
+        """Downscale oversized images so every OCR pass works on fewer pixels"""
+        scale = self.max_image_side / max(gray.shape[:2])
+        if scale < 1:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return gray
         
-    def preprocess_image(self, image_path: str) -> List[np.ndarray]:
+    def _load_gray(self, image: Union[str, np.ndarray]) -> np.ndarray:
+        """Grayscale image from a path, or from an image the caller already decoded"""
+        if isinstance(image, np.ndarray):
+            return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+    
+    def preprocess_image(self, image: Union[str, np.ndarray]) -> List[np.ndarray]:
         """Enhanced preprocessing with multiple variants"""
         try:
-            # Load image
-            img = cv2.imread(image_path)
-            if img is None:
+            # Load image directly as grayscale
+            gray = self._load_gray(image)
+            if gray is None:
                 raise ValueError("Could not load image")
+            gray = self._limit_size(gray)
             
             variants = []
             
-            # Original grayscale
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
             variants.append(gray)
             
             # High contrast
@@ -49,8 +66,8 @@ class EnhancedPrescriptionOCR:
         except Exception as e:
             logger.error(f"Preprocessing failed: {e}")
             # Fallback to simple grayscale
-            img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-            return [img] if img is not None else []
+            img = self._load_gray(image)
+            return [self._limit_size(img)] if img is not None else []
     
     def extract_text_with_tesseract(self, image: np.ndarray) -> str:
         """Extract text using Tesseract with multiple configs"""
@@ -65,13 +82,27 @@ class EnhancedPrescriptionOCR:
             best_text = ""
             max_confidence = 0
             
-            for config in configs:
-                try:
-                    text = pytesseract.image_to_string(image, config=config)
-                    if len(text.strip()) > len(best_text.strip()):
-                        best_text = text
-                except:
-                    continue
+            # Encode the image once; pytesseract reads a path directly instead
+            # of re-saving the array to a temp file for every config
+            fd, image_file = tempfile.mkstemp(suffix='.png')
+            os.close(fd)
+            try:
+                cv2.imwrite(image_file, image)
+                
+                def run_config(config: str) -> str:
+                    try:
+                        return pytesseract.image_to_string(image_file, config=config)
+                    except:
+                        return ""
+                
+                # Each config runs in its own tesseract subprocess, so threads
+                # are enough to overlap them; map keeps the results in config order
+                with ThreadPoolExecutor(max_workers=len(configs)) as executor:
+                    for text in executor.map(run_config, configs):
+                        if len(text.strip()) > len(best_text.strip()):
+                            best_text = text
+            finally:
+                os.unlink(image_file)
             
             return best_text.strip()
             
@@ -168,13 +199,14 @@ class EnhancedPrescriptionOCR:
         
         return result
     
-    def process_prescription(self, image_path: str) -> Dict[str, Any]:
-        """Main processing function with enhanced extraction"""
+    def process_prescription(self, image: Union[str, np.ndarray]) -> Dict[str, Any]:
+        """Main processing function with enhanced extraction (image path or decoded image)"""
         try:
-            logger.info(f"Processing prescription: {image_path}")
+            source = image if isinstance(image, str) else f"decoded image {image.shape}"
+            logger.info(f"Processing prescription: {source}")
             
             # Preprocess image variants
-            image_variants = self.preprocess_image(image_path)
+            image_variants = self.preprocess_image(image)
             
             if not image_variants:
                 return self._create_error_response("Could not preprocess image")
@@ -6,6 +6,7 @@ Handles PDF to image conversion for prescription scanning
 import os
 import tempfile
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Tuple, Optional
 import numpy as np
 from pathlib import Path
@@ -143,22 +144,18 @@ class PDFProcessor:
                 try:
                     page = doc[page_num]
                     
-                    # Render page to PIL image
-                    pil_image = page.render(
+                    # Render page; pdfium already produces BGR(X), the layout OpenCV expects
+                    bitmap = page.render(
                         scale=self.zoom_factor,
                         rotation=0
-                    ).to_pil()
-                    
-                    # Convert to RGB if needed
-                    if pil_image.mode != 'RGB':
-                        pil_image = pil_image.convert('RGB')
-                    
-                    # Convert to numpy array
-                    image_array = np.array(pil_image)
-                    
-                    # Convert RGB to BGR for OpenCV compatibility
-                    if CV2_SUPPORT:
-                        image_array = cv2.cvtColor(image_array, cv2.COLOR_RGB2BGR)
+                    )
+
+                    try:
+                        # Single copy out of pdfium's buffer (freed on close), dropping any X channel
+                        image_array = np.array(bitmap.to_numpy()[:, :, :3], order="C")
+                    finally:
+                        bitmap.close()
+                        page.close()
                     
                     # Create metadata
                     metadata = {
@@ -188,52 +185,70 @@ class PDFProcessor:
         """
         Save extracted images to temporary files for OCR processing
         
+        Pages are encoded concurrently; the JPEG encoders release the GIL,
+        so a thread pool overlaps them across cores.
+        
         Args:
             images: List of (image_array, metadata) tuples
             
         Returns:
-            List of temporary file paths
+            List of temporary file paths, in page order
         """
-        temp_paths = []
+        if not images:
+            return []
         
-        for i, (image_array, metadata) in enumerate(images):
+        with ThreadPoolExecutor(max_workers=min(4, len(images))) as executor:
+            futures = [
+                executor.submit(self._save_image_temporarily, image_array, metadata)
+                for image_array, metadata in images
+            ]
+        
+        temp_paths = []
+        error = None
+        for i, future in enumerate(futures):
             try:
-                # Create temporary file
-                temp_file = tempfile.NamedTemporaryFile(
-                    delete=False,
-                    suffix=f'_page_{metadata["page_number"]}.jpg',
-                    prefix='pdf_prescription_'
-                )
-                temp_path = temp_file.name
-                temp_file.close()
-                
-                # Save image
-                if CV2_SUPPORT:
-                    cv2.imwrite(temp_path, image_array)
-                elif PIL_SUPPORT:
-                    # Convert BGR back to RGB for PIL
-                    if len(image_array.shape) == 3:
-                        image_array = cv2.cvtColor(image_array, cv2.COLOR_BGR2RGB)
-                    pil_image = Image.fromarray(image_array)
-                    pil_image.save(temp_path, 'JPEG', quality=95)
-                else:
-                    raise ValueError("No image saving library available")
-                
-                temp_paths.append(temp_path)
-                logger.info(f"Saved page {metadata['page_number']} to {temp_path}")
-                
+                temp_paths.append(future.result())
             except Exception as e:
                 logger.error(f"Failed to save image {i}: {e}")
-                # Clean up any files created so far
-                for path in temp_paths:
-                    try:
-                        os.unlink(path)
-                    except:
-                        pass
-                raise ValueError(f"Failed to save extracted images: {str(e)}")
+                error = error or e
+        
+        if error is not None:
+            # Clean up the pages that were saved
+            self.cleanup_temp_files(temp_paths)
+            raise ValueError(f"Failed to save extracted images: {str(error)}")
         
         return temp_paths
     
+    def _save_image_temporarily(self, image_array: np.ndarray, metadata: Dict[str, Any]) -> str:
+        """Save one extracted page to a temporary JPEG and return its path"""
+        # Create temporary file
+        temp_file = tempfile.NamedTemporaryFile(
+            delete=False,
+            suffix=f'_page_{metadata["page_number"]}.jpg',
+            prefix='pdf_prescription_'
+        )
+        temp_path = temp_file.name
+        temp_file.close()
+        
+        try:
+            # Save image
+            if CV2_SUPPORT:
+                cv2.imwrite(temp_path, image_array)
+            elif PIL_SUPPORT:
+                # Convert BGR back to RGB for PIL
+                if len(image_array.shape) == 3:
+                    image_array = cv2.cvtColor(image_array, cv2.COLOR_BGR2RGB)
+                pil_image = Image.fromarray(image_array)
+                pil_image.save(temp_path, 'JPEG', quality=95)
+            else:
+                raise ValueError("No image saving library available")
+        except Exception:
+            os.unlink(temp_path)
+            raise
+        
+        logger.info(f"Saved page {metadata['page_number']} to {temp_path}")
+        return temp_path
+    
     def cleanup_temp_files(self, temp_paths: List[str]) -> None:
         """
         Clean up temporary files
@@ -426,4 +426,5 @@ if __name__ == "__main__":
     logger.info(f"Mode: {'Enhanced' if ENHANCED_OCR_AVAILABLE else 'Basic'}")
     logger.info("Server will be available at: http://127.0.0.1:8000")
     logger.info("API documentation at: http://127.0.0.1:8000/docs")
-    uvicorn.run(app, host="127.0.0.1", port=8000, reload=True)
+    # reload requires an import string; uvicorn refuses to reload an app object
+    uvicorn.run("simple_main:app", host="127.0.0.1", port=8000, reload=True)
@@ -7,7 +7,6 @@ import os
 import sqlite3
 import shutil
 from datetime import datetime
-import glob
 
 # Paths
 UPLOAD_DIR = "uploads"
@@ -37,18 +36,19 @@ def clean_uploads_directory():
         print("✓ Uploads directory doesn't exist")
         return
     
-    files = glob.glob(os.path.join(UPLOAD_DIR, "*"))
+    # scandir reports each entry's type without a separate stat per file
+    with os.scandir(UPLOAD_DIR) as entries:
+        files = [entry for entry in entries if entry.is_file()]
     if not files:
         print("✓ Uploads directory is already empty")
         return
     
-    for file_path in files:
+    for entry in files:
         try:
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-                print(f"  Deleted: {os.path.basename(file_path)}")
+            os.remove(entry.path)
+            print(f"  Deleted: {entry.name}")
         except Exception as e:
-            print(f"  Error deleting {file_path}: {e}")
+            print(f"  Error deleting {entry.path}: {e}")
     
     print(f"✓ Cleaned {len(files)} files from uploads directory")
 
@@ -4,10 +4,25 @@ Database inspection tool for HealthTwin AI
 View and query SQLite database contents
 """
 import sqlite3
-import json
 from datetime import datetime
 import os
 
+# orjson is C-accelerated; fall back to the stdlib for JSON previews
+try:
+    import orjson
+
+    def _jdumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    _jloads = orjson.loads
+except ImportError:
+    import json
+
+    def _jdumps(obj):
+        return json.dumps(obj, indent=2)
+
+    _jloads = json.loads
+
 DB_PATH = "healthtwin.db"
 UPLOAD_DIR = "uploads"
 
@@ -111,7 +126,9 @@ def show_timeline_data():
             print("No timeline entries found")
             return
         
-        for entry in entries:
+        for row in entries:
+            # sqlite3.Row has no .get(); work on a plain dict
+            entry = dict(row)
             print(f"\n📄 Entry ID: {entry['id']}")
             print(f"   Patient: {entry['patient_name']} ({entry['patient_id']})")
             print(f"   Doctor: {entry.get('doctor_name', 'N/A')}")
@@ -133,6 +150,14 @@ def show_timeline_data():
             if entry.get('extracted_text'):
                 text_preview = entry['extracted_text'][:100] + "..." if len(entry['extracted_text']) > 100 else entry['extracted_text']
                 print(f"   OCR Text: {text_preview}")
+            
+            # Show structured data preview if available
+            if entry.get('structured_data'):
+                try:
+                    structured_preview = _jdumps(_jloads(entry['structured_data']))[:200]
+                except ValueError:
+                    structured_preview = entry['structured_data'][:200]
+                print(f"   Structured Data: {structured_preview}")
         
         conn.close()
         
@@ -148,28 +173,32 @@ def show_file_analysis():
         print("Uploads directory doesn't exist")
         return
     
-    files = os.listdir(UPLOAD_DIR)
-    if not files:
-        print("No files in uploads directory")
-        return
-    
+    total_files = 0
     total_size = 0
     file_types = {}
     
-    for filename in files:
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        if os.path.isfile(file_path):
-            size = os.path.getsize(file_path)
+    # scandir yields entries with the file type already known, so regular
+    # files are picked out without an extra stat per name
+    with os.scandir(UPLOAD_DIR) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            size = entry.stat().st_size
+            total_files += 1
             total_size += size
             
             # Get file extension
-            ext = os.path.splitext(filename)[1].lower()
+            ext = os.path.splitext(entry.name)[1].lower()
             file_types[ext] = file_types.get(ext, 0) + 1
             
-            print(f"📎 {filename} ({size:,} bytes)")
+            print(f"📎 {entry.name} ({size:,} bytes)")
+    
+    if not total_files:
+        print("No files in uploads directory")
+        return
     
     print(f"\n📊 Summary:")
-    print(f"   Total files: {len(files)}")
+    print(f"   Total files: {total_files}")
     print(f"   Total size: {total_size:,} bytes ({total_size/1024/1024:.2f} MB)")
     print(f"   File types: {dict(file_types)}")
 
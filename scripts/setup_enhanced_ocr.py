@@ -2,21 +2,40 @@
 Setup script for Enhanced OCR System
 Installs dependencies and downloads required models
 """
+import argparse
+import json
 import subprocess
 import sys
 import os
+import time
+import threading
+import multiprocessing
 import logging
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TROCR_MODEL_NAME = "microsoft/trocr-base-handwritten"
+MODELS_MANIFEST = Path(".models_cache_manifest.json")
+
+# (process, queue) for the background PaddleOCR prefetch started by main()
+_paddle_prefetch = None
+
 def run_command(command, description=""):
-    """Run a command and handle errors"""
+    """Run a command and handle errors
+    
+    A string goes through the shell; an argv list runs without one, so its
+    arguments are passed verbatim on every platform (cmd.exe included).
+    """
     logger.info(f"Running: {description or command}")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        result = subprocess.run(
+            command, shell=isinstance(command, str), check=True, capture_output=True, text=True
+        )
         if result.stdout:
             logger.info(result.stdout)
         return True
@@ -25,12 +44,33 @@ def run_command(command, description=""):
         logger.error(f"Error: {e.stderr}")
         return False
 
+def run_commands_parallel(commands, workers=4):
+    """Run independent (command, description) pairs concurrently
+    
+    Returns a dict mapping each description to its success flag.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_command, cmd, desc): desc for cmd, desc in commands}
+        return {futures[future]: future.result() for future in as_completed(futures)}
+
+def pip_install(args, description, attempts=3):
+    """Run pip install with the given argument list, retrying with exponential backoff"""
+    command = [sys.executable, "-m", "pip", "install", "--retries", "5", "--timeout", "30", *args]
+    for attempt in range(attempts):
+        if run_command(command, description):
+            return True
+        if attempt < attempts - 1:
+            delay = 2 ** attempt
+            logger.warning(f"{description} failed - retrying in {delay}s")
+            time.sleep(delay)
+    return False
+
 def install_dependencies():
     """Install Python dependencies"""
     logger.info("Installing Python dependencies...")
     
     # Install basic requirements
-    if not run_command("pip install -r requirements.txt", "Installing basic requirements"):
+    if not pip_install(["-r", "requirements.txt"], "Installing basic requirements"):
         logger.error("Failed to install basic requirements")
         return False
     
@@ -42,12 +82,20 @@ def install_dependencies():
         "easyocr>=1.7.0",
         "langdetect>=1.0.9",
         "googletrans==4.0.0rc1",
-        "albumentations>=1.3.0"
+        "albumentations>=1.3.0",
+        "hf_transfer>=0.1.4",
+        "orjson>=3.9.0"
     ]
     
+    # Resolve everything in a single pip invocation, preferring wheels over sdist builds
+    if pip_install(["--prefer-binary", *additional_deps], "Installing additional dependencies", attempts=1):
+        return True
+    
+    # Fall back to per-package installs so one bad package doesn't block the rest
+    logger.warning("Batch install failed - retrying packages individually")
     for dep in additional_deps:
         logger.info(f"Installing {dep}...")
-        if not run_command(f"pip install {dep}", f"Installing {dep}"):
+        if not pip_install(["--prefer-binary", dep], f"Installing {dep}"):
             logger.warning(f"Failed to install {dep} - continuing anyway")
     
     return True
@@ -58,34 +106,67 @@ def download_spacy_models():
     
     models = ["en_core_web_sm"]
     
-    for model in models:
-        logger.info(f"Downloading spaCy model: {model}")
-        if not run_command(f"python -m spacy download {model}", f"Downloading {model}"):
+    results = run_commands_parallel(
+        [(f"python -m spacy download {model}", model) for model in models]
+    )
+    for model, ok in results.items():
+        if not ok:
             logger.warning(f"Failed to download {model} - some features may not work")
     
     return True
 
+def enable_hf_transfer():
+    """Use the Rust hf_transfer backend for HuggingFace downloads when installed"""
+    # huggingface_hub errors out if the flag is set without the package present
+    if importlib.util.find_spec("hf_transfer") is not None:
+        os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+def _hf_home():
+    """Return the HuggingFace cache root, defaulting HF_HOME if unset
+    
+    transformers and datasets both cache under $HF_HOME, so pointing it at a
+    shared volume (e.g. on CI runners) lets every run reuse the same weights.
+    """
+    os.environ.setdefault("HF_HOME", str(Path.home() / ".cache" / "huggingface"))
+    return Path(os.environ["HF_HOME"])
+
 def setup_model_cache():
     """Setup model cache directories"""
     logger.info("Setting up model cache directories...")
+    enable_hf_transfer()
+    hf_home = _hf_home()
     
     cache_dirs = [
-        Path.home() / ".cache" / "huggingface" / "transformers",
+        hf_home / "hub",
+        hf_home / "datasets",
         Path.home() / ".cache" / "torch" / "hub",
         Path.home() / ".paddleocr"
     ]
     
+    created_dirs = []
     for cache_dir in cache_dirs:
+        if os.path.isdir(cache_dir):
+            continue
         try:
-            cache_dir.mkdir(parents=True, exist_ok=True)
-            logger.info(f"Created cache directory: {cache_dir}")
+            os.makedirs(cache_dir, exist_ok=True)
+            created_dirs.append(str(cache_dir))
         except Exception as e:
             logger.warning(f"Failed to create cache directory {cache_dir}: {e}")
     
+    if created_dirs:
+        logger.info(f"Created cache directories: {', '.join(created_dirs)}")
+    else:
+        logger.info("Model cache directories already exist")
+    
     return True
 
-def test_imports():
-    """Test if all required modules can be imported"""
+def test_imports(deep_check=False):
+    """Test if all required modules can be imported
+    
+    By default only checks that each module is installed, without running
+    its import-time initialization. With deep_check, modules are actually
+    imported and CUDA availability is reported.
+    """
     logger.info("Testing module imports...")
     
     test_modules = [
@@ -105,12 +186,19 @@ def test_imports():
     
     for module_name, display_name in test_modules:
         try:
-            __import__(module_name)
+            if deep_check:
+                __import__(module_name)
+            elif importlib.util.find_spec(module_name) is None:
+                raise ImportError(f"No module named '{module_name}'")
             logger.info(f"✓ {display_name} imported successfully")
         except ImportError as e:
             logger.error(f"✗ Failed to import {display_name}: {e}")
             failed_imports.append(display_name)
     
+    if deep_check and "PyTorch" not in failed_imports:
+        import torch
+        logger.info(f"CUDA available: {torch.cuda.is_available()}")
+    
     if failed_imports:
         logger.error(f"Failed to import: {', '.join(failed_imports)}")
         logger.error("Some features may not work properly")
@@ -119,55 +207,150 @@ def test_imports():
         logger.info("All modules imported successfully!")
         return True
 
-def download_models():
-    """Download required ML models"""
-    logger.info("Downloading required ML models...")
-    
+def _download_trocr():
+    """Download the TrOCR handwriting model"""
     try:
-        # Test TrOCR model download
         logger.info("Testing TrOCR model download...")
+        # Imported here rather than at module top: install_dependencies may
+        # only have installed torch/transformers during this run
+        if importlib.util.find_spec("torch") is None:
+            raise ImportError("PyTorch is not installed")
         from transformers import TrOCRProcessor, VisionEncoderDecoderModel
         
-        model_name = "microsoft/trocr-base-handwritten"
+        model_name = TROCR_MODEL_NAME
         logger.info(f"Downloading {model_name}...")
         
         processor = TrOCRProcessor.from_pretrained(model_name)
         model = VisionEncoderDecoderModel.from_pretrained(model_name)
         
         logger.info("TrOCR model downloaded successfully")
+        return True
         
     except Exception as e:
         logger.error(f"Failed to download TrOCR model: {e}")
         logger.warning("Handwriting recognition may not work")
-    
+        return False
+
+def _download_paddle_en():
+    """Download the PaddleOCR English model"""
     try:
-        # Test PaddleOCR initialization
         logger.info("Testing PaddleOCR initialization...")
         import paddleocr
         
         # Initialize with English (updated parameters)
         ocr = paddleocr.PaddleOCR(use_angle_cls=True, lang='en')
         logger.info("PaddleOCR English model loaded successfully")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Failed to initialize PaddleOCR (en): {e}")
+        logger.warning("Multi-language OCR may not work")
+        return False
 
-        # Test with Hindi
+def _download_paddle_hi():
+    """Download the PaddleOCR Hindi model"""
+    try:
+        import paddleocr
+        
         ocr_hi = paddleocr.PaddleOCR(use_angle_cls=True, lang='hi')
         logger.info("PaddleOCR Hindi model loaded successfully")
+        return True
         
     except Exception as e:
-        logger.error(f"Failed to initialize PaddleOCR: {e}")
+        logger.error(f"Failed to initialize PaddleOCR (hi): {e}")
         logger.warning("Multi-language OCR may not work")
-    
+        return False
+
+def _download_easyocr():
+    """Download the EasyOCR English model"""
     try:
-        # Test EasyOCR initialization
         logger.info("Testing EasyOCR initialization...")
         import easyocr
         
         reader = easyocr.Reader(['en'], gpu=False)
         logger.info("EasyOCR initialized successfully")
+        return True
         
     except Exception as e:
         logger.error(f"Failed to initialize EasyOCR: {e}")
         logger.warning("Alternative OCR engine may not work")
+        return False
+
+def models_cached():
+    """Check whether a previous run already downloaded all models"""
+    if not MODELS_MANIFEST.exists():
+        return False
+    trocr_dir = _hf_home() / "hub" / f"models--{TROCR_MODEL_NAME.replace('/', '--')}"
+    return trocr_dir.is_dir()
+
+def write_models_manifest():
+    """Record a successful model download so later runs can skip it"""
+    manifest = {
+        "trocr": TROCR_MODEL_NAME,
+        "paddle": ["en", "hi"],
+        "easy": ["en"],
+        "completed_at": time.time()
+    }
+    try:
+        with open(MODELS_MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2)
+    except Exception as e:
+        logger.warning(f"Failed to write models manifest: {e}")
+
+def _prefetch_paddle(queue):
+    """Initialize PaddleOCR models in a child process and report the outcome"""
+    queue.put(_download_paddle_en() and _download_paddle_hi())
+
+def start_paddle_prefetch():
+    """Start downloading PaddleOCR models in the background"""
+    global _paddle_prefetch
+    if models_cached():
+        return
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_prefetch_paddle, args=(queue,), daemon=True)
+    process.start()
+    _paddle_prefetch = (process, queue)
+
+def _join_paddle_prefetch():
+    """Wait for the background PaddleOCR prefetch and return its result"""
+    process, queue = _paddle_prefetch
+    process.join()
+    if process.exitcode != 0:
+        logger.error(f"PaddleOCR prefetch exited with code {process.exitcode}")
+        return False
+    return queue.get()
+
+def download_models():
+    """Download required ML models"""
+    if models_cached():
+        logger.info(f"Models already cached (see {MODELS_MANIFEST}) - skipping download")
+        return True
+    
+    logger.info("Downloading required ML models...")
+    enable_hf_transfer()
+    _hf_home()
+    
+    # Downloads are network-bound, so fetch them concurrently
+    downloaders = [_download_trocr, _download_easyocr]
+    if _paddle_prefetch is not None:
+        downloaders.append(_join_paddle_prefetch)
+    else:
+        downloaders += [_download_paddle_en, _download_paddle_hi]
+    
+    all_ok = True
+    with ThreadPoolExecutor(max_workers=len(downloaders)) as executor:
+        futures = {executor.submit(fn): fn.__name__ for fn in downloaders}
+        for future in as_completed(futures):
+            try:
+                if not future.result():
+                    all_ok = False
+            except Exception as e:
+                logger.error(f"Model download {futures[future]} failed: {e}")
+                all_ok = False
+    
+    if all_ok:
+        write_models_manifest()
+    return all_ok
 
 def create_test_environment():
     """Create test environment and files"""
@@ -178,7 +361,7 @@ def create_test_environment():
     
     for test_dir in test_dirs:
         try:
-            Path(test_dir).mkdir(exist_ok=True)
+            os.makedirs(test_dir, exist_ok=True)
             logger.info(f"Created directory: {test_dir}")
         except Exception as e:
             logger.warning(f"Failed to create directory {test_dir}: {e}")
@@ -198,37 +381,64 @@ def create_test_environment():
     }
     
     try:
-        import json
         with open("enhanced_ocr_config.json", "w") as f:
             json.dump(config, f, indent=2)
         logger.info("Created configuration file: enhanced_ocr_config.json")
     except Exception as e:
         logger.warning(f"Failed to create configuration file: {e}")
+        return False
+    
+    return True
 
 def main():
     """Main setup function"""
+    parser = argparse.ArgumentParser(description="Enhanced OCR setup")
+    parser.add_argument("--offline", action="store_true",
+                        help="Use only locally cached models (no HuggingFace network access)")
+    parser.add_argument("--deep-check", action="store_true",
+                        help="Fully import each module (slow) instead of only locating it")
+    args = parser.parse_args()
+    
+    if args.offline:
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+        os.environ["HF_HUB_OFFLINE"] = "1"
+    
     logger.info("Enhanced OCR Setup Script")
     logger.info("=" * 50)
     
-    steps = [
-        ("Installing dependencies", install_dependencies),
+    # Dependencies must be installed first and imports are checked last;
+    # the steps in between are independent and run concurrently.
+    first_step = ("Installing dependencies", install_dependencies)
+    parallel_steps = [
         ("Downloading spaCy models", download_spacy_models),
         ("Setting up model cache", setup_model_cache),
-        ("Testing imports", test_imports),
         ("Downloading ML models", download_models),
         ("Creating test environment", create_test_environment)
     ]
+    last_step = ("Testing imports", lambda: test_imports(deep_check=args.deep_check))
     
     failed_steps = []
+    failed_lock = threading.Lock()
     
-    for step_name, step_function in steps:
+    def run_step(step_name, step_function):
         logger.info(f"\n--- {step_name} ---")
         try:
-            if not step_function():
-                failed_steps.append(step_name)
+            ok = step_function()
         except Exception as e:
             logger.error(f"Step '{step_name}' failed with error: {e}")
-            failed_steps.append(step_name)
+            ok = False
+        if not ok:
+            with failed_lock:
+                failed_steps.append(step_name)
+    
+    run_step(*first_step)
+    # PaddleOCR init is slow and CPU-heavy; overlap it with the remaining steps
+    start_paddle_prefetch()
+    with ThreadPoolExecutor(max_workers=len(parallel_steps)) as executor:
+        futures = [executor.submit(run_step, name, fn) for name, fn in parallel_steps]
+        for future in as_completed(futures):
+            future.result()
+    run_step(*last_step)
     
     logger.info("\n" + "=" * 50)
     logger.info("Setup Summary")
@@ -3,16 +3,22 @@
 Setup script for medical handwriting datasets
 """
 
+import argparse
+import gzip
 import logging
 import sys
 import os
 import json
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
-sys.path.append(str(project_root / "app"))
 
 from app.ml_pipeline.dataset_manager import DatasetManager
 from app.ml_pipeline.medical_dataset_creator import MedicalDatasetCreator
@@ -20,8 +26,52 @@ from app.ml_pipeline.medical_dataset_creator import MedicalDatasetCreator
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Terms drawn per run; each contributes at least one sample, so a complete
+# samples file holds at least this many entries
+NUM_SYNTHETIC_SAMPLES = 500
+
+def save_samples(samples, samples_file, human_readable=False):
+    """Save samples as indented JSON, or as compact gzip-compressed JSON
+    
+    The file in the other format is removed afterwards, so a stale copy
+    is never picked up by DatasetManager.load_samples().
+    """
+    compressed_file = samples_file.with_suffix('.json.gz')
+    
+    if human_readable:
+        if orjson is not None:
+            samples_file.write_bytes(orjson.dumps(
+                samples, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            ))
+        else:
+            with open(samples_file, 'w') as f:
+                json.dump(samples, f, indent=2)
+        compressed_file.unlink(missing_ok=True)
+        return samples_file
+    
+    with gzip.open(compressed_file, 'wb') as f:
+        if orjson is not None:
+            f.write(orjson.dumps(samples, option=orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            f.write(json.dumps(samples).encode('utf-8'))
+    samples_file.unlink(missing_ok=True)
+    return compressed_file
+
+def samples_complete(samples, expected=NUM_SYNTHETIC_SAMPLES):
+    """Whether previously saved samples come from a finished run"""
+    if len(samples) < expected:
+        return False
+    return all(Path(sample.get('image_path', '')).is_file() for sample in samples)
+
 def main():
     """Main setup function"""
+    parser = argparse.ArgumentParser(description="Setup medical handwriting datasets")
+    parser.add_argument("--human-readable", action="store_true",
+                        help="Write indented, uncompressed medical_samples.json")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate samples even if they already exist")
+    args = parser.parse_args()
+    
     logger.info("🚀 Setting up medical handwriting datasets...")
     
     try:
@@ -29,17 +79,33 @@ def main():
         dataset_manager = DatasetManager()
         dataset_creator = MedicalDatasetCreator(dataset_manager)
         
-        # Create synthetic medical samples
-        logger.info("📝 Creating synthetic medical samples...")
-        synthetic_samples = dataset_creator.create_synthetic_samples(num_samples=500)
-        
-        # Save samples metadata
-        samples_file = dataset_manager.data_dir / "medical_samples.json"
-        with open(samples_file, 'w') as f:
-            json.dump(synthetic_samples, f, indent=2)
+        # Reuse samples from a previous run unless regeneration is forced
+        existing_samples = []
+        if not args.force:
+            try:
+                existing_samples = dataset_manager.load_samples()
+            except (OSError, EOFError, ValueError):
+                # Missing, truncated or corrupt samples file
+                existing_samples = []
         
-        logger.info(f"✅ Created {len(synthetic_samples)} synthetic samples")
-        logger.info(f"📁 Samples saved to: {samples_file}")
+        if existing_samples and samples_complete(existing_samples):
+            logger.info(f"✅ Found {len(existing_samples)} existing synthetic samples - skipping generation")
+        else:
+            if existing_samples:
+                logger.warning(f"⚠️ Existing samples are incomplete ({len(existing_samples)} found) - regenerating")
+            # Create synthetic medical samples
+            logger.info("📝 Creating synthetic medical samples...")
+            synthetic_samples = dataset_creator.create_synthetic_samples(num_samples=NUM_SYNTHETIC_SAMPLES)
+            
+            # Save samples metadata
+            samples_file = save_samples(
+                synthetic_samples,
+                dataset_manager.data_dir / "medical_samples.json",
+                human_readable=args.human_readable
+            )
+            
+            logger.info(f"✅ Created {len(synthetic_samples)} synthetic samples")
+            logger.info(f"📁 Samples saved to: {samples_file}")
         
         # Test medical vocabulary
         vocabulary = dataset_manager.get_medical_vocabulary()
@@ -3,31 +3,41 @@
 Test script for HealthTwin API
 """
 import requests
-import json
+import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
 
 BASE_URL = "http://localhost:8000"
 
+# Shared session so every call reuses the same keep-alive connection pool
+SESSION = requests.Session()
+
 def test_root_endpoint():
     """Test the root endpoint"""
     try:
-        response = requests.get(f"{BASE_URL}/", timeout=5)
-        print(f"Root endpoint status: {response.status_code}")
-        print(f"Root endpoint response: {response.json()}")
+        response = SESSION.get(f"{BASE_URL}/", timeout=5)
+        body = response.json()
+        logger.info("Root endpoint status: %s", response.status_code)
+        logger.info("Root endpoint response: %s", body)
         return response.status_code == 200
     except Exception as e:
-        print(f"Root endpoint error: {e}")
+        logger.error("Root endpoint error: %s", e)
         return False
 
 def test_health_endpoint():
     """Test the health endpoint"""
     try:
-        response = requests.get(f"{BASE_URL}/health", timeout=5)
-        print(f"Health endpoint status: {response.status_code}")
-        print(f"Health endpoint response: {response.json()}")
+        response = SESSION.get(f"{BASE_URL}/health", timeout=5)
+        body = response.json()
+        logger.info("Health endpoint status: %s", response.status_code)
+        logger.info("Health endpoint response: %s", body)
         return response.status_code == 200
     except Exception as e:
-        print(f"Health endpoint error: {e}")
+        logger.error("Health endpoint error: %s", e)
         return False
 
 def test_register_patient():
@@ -37,50 +47,52 @@ def test_register_patient():
             "phone": "1234567890",
             "name": "Test Patient"
         }
-        response = requests.post(f"{BASE_URL}/register", json=data, timeout=5)
-        print(f"Register endpoint status: {response.status_code}")
-        print(f"Register endpoint response: {response.json()}")
+        response = SESSION.post(f"{BASE_URL}/register", json=data, timeout=5)
+        body = response.json()
+        logger.info("Register endpoint status: %s", response.status_code)
+        logger.info("Register endpoint response: %s", body)
         
         if response.status_code == 200:
-            return response.json().get("healthtwin_id")
+            return body.get("healthtwin_id")
         return None
     except Exception as e:
-        print(f"Register endpoint error: {e}")
+        logger.error("Register endpoint error: %s", e)
         return None
 
 def test_timeline_endpoint(patient_id):
     """Test timeline endpoint"""
     try:
-        response = requests.get(f"{BASE_URL}/timeline/{patient_id}", timeout=5)
-        print(f"Timeline endpoint status: {response.status_code}")
-        print(f"Timeline endpoint response: {response.json()}")
+        response = SESSION.get(f"{BASE_URL}/timeline/{patient_id}", timeout=5)
+        body = response.json()
+        logger.info("Timeline endpoint status: %s", response.status_code)
+        logger.info("Timeline endpoint response: %s", body)
         return response.status_code == 200
     except Exception as e:
-        print(f"Timeline endpoint error: {e}")
+        logger.error("Timeline endpoint error: %s", e)
         return False
 
 def main():
     print("Testing HealthTwin API...")
     print("=" * 50)
     
-    # Test basic endpoints
-    root_ok = test_root_endpoint()
-    print()
-    
-    health_ok = test_health_endpoint()
-    print()
+    def registration_flow():
+        # Timeline depends on the registered patient, so keep these serial
+        patient_id = test_register_patient()
+        if patient_id:
+            return patient_id, test_timeline_endpoint(patient_id)
+        return patient_id, False
     
-    # Test registration
-    patient_id = test_register_patient()
+    # Independent checks run concurrently
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        root_future = executor.submit(test_root_endpoint)
+        health_future = executor.submit(test_health_endpoint)
+        registration_future = executor.submit(registration_flow)
+        
+        root_ok = root_future.result()
+        health_ok = health_future.result()
+        patient_id, timeline_ok = registration_future.result()
     print()
     
-    # Test timeline if registration worked
-    if patient_id:
-        timeline_ok = test_timeline_endpoint(patient_id)
-        print()
-    else:
-        timeline_ok = False
-    
     # Summary
     print("=" * 50)
     print("Test Results:")
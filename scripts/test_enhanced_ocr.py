@@ -3,16 +3,28 @@ Test script for Enhanced OCR System
 Tests handwriting recognition, multi-language support, and unified pipeline
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import functools
+import io
 import json
 import time
-import os
 from pathlib import Path
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _loads(body):
+    """Parse a JSON response body straight from bytes"""
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
 # API Configuration
 BASE_URL = "http://127.0.0.1:8000"
 TEST_IMAGES_DIR = Path("test_images")
@@ -22,46 +34,61 @@ class EnhancedOCRTester:
         self.base_url = BASE_URL
         self.test_results = []
         
+        # Reuse pooled keep-alive connections for every request to the API
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        )
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+        
     def test_health_check(self):
         """Test health check endpoint"""
         logger.info("Testing health check endpoint...")
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=10)
+            response = self.session.get(f"{self.base_url}/health", timeout=10)
             if response.status_code == 200:
-                data = response.json()
+                data = _loads(response.content)
                 logger.info("Health check passed")
-                logger.info(f"Available engines: {data.get('ocr_engines', {})}")
-                logger.info(f"Features: {data.get('features', [])}")
+                logger.info("Available engines: %s", data.get('ocr_engines', {}))
+                logger.info("Features: %s", data.get('features', []))
                 return True
             else:
-                logger.error(f"Health check failed: {response.status_code}")
+                logger.error("Health check failed: %s", response.status_code)
                 return False
         except Exception as e:
-            logger.error(f"Health check error: {e}")
+            logger.error("Health check error: %s", e)
             return False
     
     def test_ocr_capabilities(self):
         """Test OCR capabilities endpoint"""
         logger.info("Testing OCR capabilities endpoint...")
         try:
-            response = requests.get(f"{self.base_url}/ocr/capabilities", timeout=10)
+            response = self.session.get(f"{self.base_url}/ocr/capabilities", timeout=10)
             if response.status_code == 200:
-                data = response.json()
+                data = _loads(response.content)
                 logger.info("OCR capabilities retrieved successfully")
-                logger.info(f"Available endpoints: {list(data.get('available_endpoints', {}).keys())}")
-                logger.info(f"Processing modes: {list(data.get('processing_modes', {}).keys())}")
+                logger.info("Available endpoints: %s", list(data.get('available_endpoints', {}).keys()))
+                logger.info("Processing modes: %s", list(data.get('processing_modes', {}).keys()))
                 return True
             else:
-                logger.error(f"OCR capabilities failed: {response.status_code}")
+                logger.error("OCR capabilities failed: %s", response.status_code)
                 return False
         except Exception as e:
-            logger.error(f"OCR capabilities error: {e}")
+            logger.error("OCR capabilities error: %s", e)
             return False
     
-    def create_test_image(self, image_type="printed"):
-        """Create a test prescription image"""
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def create_test_image(image_type="printed"):
+        """Create a test prescription image
+        
+        Returns a (filename, bytes, mime type) tuple ready for a multipart upload.
+        Rendering is deterministic, so results are cached per image type.
+        """
         from PIL import Image, ImageDraw, ImageFont
-        import tempfile
         
         # Create a simple test prescription image
         width, height = 800, 600
@@ -74,6 +101,7 @@ class EnhancedOCRTester:
         except:
             font = None
         
+        text_lines = []
         if image_type == "printed":
             # Create printed text prescription
             text_lines = [
@@ -96,11 +124,6 @@ class EnhancedOCRTester:
                 "",
                 "Follow up after 1 week"
             ]
-            
-            y_position = 50
-            for line in text_lines:
-                draw.text((50, y_position), line, fill='black', font=font)
-                y_position += 25
                 
         elif image_type == "multilingual":
             # Create mixed language prescription
@@ -123,79 +146,92 @@ class EnhancedOCRTester:
                 "",
                 "Follow up: ૧ અઠવાડિયા પછી"  # Gujarati follow-up
             ]
-            
-            y_position = 50
-            for line in text_lines:
-                draw.text((50, y_position), line, fill='black', font=font)
-                y_position += 25
-        
-        # Save to temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-        image.save(temp_file.name, 'PNG')
-        return temp_file.name
+        
+        # Render all lines in one call, keeping the original 25px line pitch
+        line_height = draw.textbbox((0, 0), "A", font=font)[3]
+        draw.multiline_text((50, 50), "\n".join(text_lines), fill='black', font=font,
+                            spacing=25 - line_height)
+        
+        # Encode in memory so the same bytes can be uploaded to both endpoints;
+        # JPEG at q85 is far smaller than PNG and near-lossless for printed text
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=85, optimize=True)
+        return ('test_prescription.jpg', buffer.getvalue(), 'image/jpeg')
     
-    def test_legacy_ocr(self, image_path):
+    def test_legacy_ocr(self, image):
         """Test legacy OCR endpoint"""
         logger.info("Testing legacy OCR endpoint...")
         try:
-            with open(image_path, 'rb') as f:
-                files = {'file': ('test_prescription.png', f, 'image/png')}
-                response = requests.post(
-                    f"{self.base_url}/patient/upload-prescription",
-                    files=files,
-                    timeout=30
-                )
-            
+            name, data, mime = image
+            files = {'file': (name, io.BytesIO(data), mime)}
+            response = self.session.post(
+                f"{self.base_url}/patient/upload-prescription",
+                files=files,
+                timeout=30
+            )
+        except Exception as e:
+            logger.error("Legacy OCR error: %s", e)
+            return None
+        
+        try:
             if response.status_code == 200:
-                data = response.json()
+                # Parse the raw bytes once instead of decoding to str first
+                data = _loads(response.content)
                 logger.info("Legacy OCR test passed")
-                logger.info(f"Confidence: {data.get('confidence_score', 0):.3f}")
-                logger.info(f"Method: {data.get('extraction_method', 'Unknown')}")
+                logger.info("Confidence: %.3f", data.get('confidence_score', 0))
+                logger.info("Method: %s", data.get('extraction_method', 'Unknown'))
                 return data
             else:
-                logger.error(f"Legacy OCR failed: {response.status_code}")
-                logger.error(f"Response: {response.text}")
+                logger.error("Legacy OCR failed: %s", response.status_code)
+                logger.error("Response: %s", response.text)
                 return None
                 
         except Exception as e:
-            logger.error(f"Legacy OCR error: {e}")
+            logger.error("Legacy OCR error: %s", e)
             return None
     
-    def test_enhanced_ocr(self, image_path, mode="standard"):
+    def test_enhanced_ocr(self, image, mode="standard"):
         """Test enhanced OCR endpoint"""
-        logger.info(f"Testing enhanced OCR endpoint (mode: {mode})...")
+        logger.info("Testing enhanced OCR endpoint (mode: %s)...", mode)
+        try:
+            name, data, mime = image
+            files = {'file': (name, io.BytesIO(data), mime)}
+            params = {'processing_mode': mode}
+            response = self.session.post(
+                f"{self.base_url}/patient/upload-prescription-enhanced",
+                files=files,
+                params=params,
+                timeout=60
+            )
+        except Exception as e:
+            logger.error("Enhanced OCR error: %s", e)
+            return None
+        
         try:
-            with open(image_path, 'rb') as f:
-                files = {'file': ('test_prescription.png', f, 'image/png')}
-                params = {'processing_mode': mode}
-                response = requests.post(
-                    f"{self.base_url}/patient/upload-prescription-enhanced",
-                    files=files,
-                    params=params,
-                    timeout=60
-                )
-            
             if response.status_code == 200:
-                data = response.json()
+                # Parse the raw bytes once instead of decoding to str first
+                data = _loads(response.content)
                 logger.info("Enhanced OCR test passed")
-                logger.info(f"Confidence: {data.get('confidence_score', 0):.3f}")
-                logger.info(f"Processing mode: {data.get('processing_mode', 'Unknown')}")
+                logger.info("Confidence: %.3f", data.get('confidence_score', 0))
+                logger.info("Processing mode: %s", data.get('processing_mode', 'Unknown'))
                 
-                # Log enhanced features
-                enhanced_features = data.get('enhanced_features', {})
-                logger.info(f"Handwriting detected: {enhanced_features.get('handwriting_info', {}).get('handwriting_detected', False)}")
-                logger.info(f"Multi-language detected: {enhanced_features.get('multilingual_info', {}).get('is_multilingual', False)}")
-                logger.info(f"Engines used: {enhanced_features.get('engines_used', [])}")
-                logger.info(f"Processing time: {enhanced_features.get('processing_time', 0):.2f}s")
+                # Log enhanced features (arguments are evaluated eagerly, so skip the
+                # nested lookups entirely when INFO is disabled)
+                if logger.isEnabledFor(logging.INFO):
+                    enhanced_features = data.get('enhanced_features', {})
+                    logger.info("Handwriting detected: %s", enhanced_features.get('handwriting_info', {}).get('handwriting_detected', False))
+                    logger.info("Multi-language detected: %s", enhanced_features.get('multilingual_info', {}).get('is_multilingual', False))
+                    logger.info("Engines used: %s", enhanced_features.get('engines_used', []))
+                    logger.info("Processing time: %.2fs", enhanced_features.get('processing_time', 0))
                 
                 return data
             else:
-                logger.error(f"Enhanced OCR failed: {response.status_code}")
-                logger.error(f"Response: {response.text}")
+                logger.error("Enhanced OCR failed: %s", response.status_code)
+                logger.error("Response: %s", response.text)
                 return None
                 
         except Exception as e:
-            logger.error(f"Enhanced OCR error: {e}")
+            logger.error("Enhanced OCR error: %s", e)
             return None
     
     def compare_results(self, legacy_result, enhanced_result):
@@ -210,18 +246,18 @@ class EnhancedOCRTester:
         legacy_conf = legacy_result.get('confidence_score', 0)
         enhanced_conf = enhanced_result.get('confidence_score', 0)
         
-        logger.info(f"Confidence comparison:")
-        logger.info(f"  Legacy: {legacy_conf:.3f}")
-        logger.info(f"  Enhanced: {enhanced_conf:.3f}")
-        logger.info(f"  Improvement: {enhanced_conf - legacy_conf:.3f}")
+        logger.info("Confidence comparison:")
+        logger.info("  Legacy: %.3f", legacy_conf)
+        logger.info("  Enhanced: %.3f", enhanced_conf)
+        logger.info("  Improvement: %.3f", enhanced_conf - legacy_conf)
         
         # Compare extracted medications
         legacy_meds = legacy_result.get('extracted_data', {}).get('medications', '')
         enhanced_meds = enhanced_result.get('prescription_data', {}).get('medications', '')
         
-        logger.info(f"Medications comparison:")
-        logger.info(f"  Legacy: {legacy_meds}")
-        logger.info(f"  Enhanced: {enhanced_meds}")
+        logger.info("Medications comparison:")
+        logger.info("  Legacy: %s", legacy_meds)
+        logger.info("  Enhanced: %s", enhanced_meds)
         
         # Enhanced features
         enhanced_features = enhanced_result.get('enhanced_features', {})
@@ -229,7 +265,31 @@ class EnhancedOCRTester:
             logger.info("Enhanced features detected:")
             for feature, info in enhanced_features.items():
                 if isinstance(info, dict) and info:
-                    logger.info(f"  {feature}: {info}")
+                    logger.info("  %s: %s", feature, info)
+    
+    def _run_scenario(self, image_type, processing_mode):
+        """Run legacy and enhanced OCR on one test image and record the results"""
+        logger.info("\n--- Testing %s prescription with %s mode ---", image_type, processing_mode)
+        
+        # Create test image
+        image = self.create_test_image(image_type)
+        
+        # Test legacy OCR
+        legacy_result = self.test_legacy_ocr(image)
+        
+        # Test enhanced OCR
+        enhanced_result = self.test_enhanced_ocr(image, processing_mode)
+        
+        # Compare results
+        self.compare_results(legacy_result, enhanced_result)
+        
+        # Store results
+        self.test_results.append({
+            'image_type': image_type,
+            'processing_mode': processing_mode,
+            'legacy_result': legacy_result,
+            'enhanced_result': enhanced_result
+        })
     
     def run_comprehensive_test(self):
         """Run comprehensive test suite"""
@@ -250,36 +310,10 @@ class EnhancedOCRTester:
             ("multilingual", "comprehensive")
         ]
         
+        # Run one at a time: the OCR server is CPU-bound, so overlapping scenarios
+        # would inflate each other's processing_time and interleave their logs
         for image_type, processing_mode in test_scenarios:
-            logger.info(f"\n--- Testing {image_type} prescription with {processing_mode} mode ---")
-            
-            # Create test image
-            image_path = self.create_test_image(image_type)
-            
-            try:
-                # Test legacy OCR
-                legacy_result = self.test_legacy_ocr(image_path)
-                
-                # Test enhanced OCR
-                enhanced_result = self.test_enhanced_ocr(image_path, processing_mode)
-                
-                # Compare results
-                self.compare_results(legacy_result, enhanced_result)
-                
-                # Store results
-                self.test_results.append({
-                    'image_type': image_type,
-                    'processing_mode': processing_mode,
-                    'legacy_result': legacy_result,
-                    'enhanced_result': enhanced_result
-                })
-                
-            finally:
-                # Cleanup test image
-                try:
-                    os.unlink(image_path)
-                except:
-                    pass
+            self._run_scenario(image_type, processing_mode)
         
         # Test 4: Performance comparison
         self.analyze_performance()
@@ -295,37 +329,48 @@ class EnhancedOCRTester:
             logger.warning("No test results to analyze")
             return
         
-        total_tests = len(self.test_results)
-        successful_legacy = sum(1 for r in self.test_results if r['legacy_result'] and r['legacy_result'].get('success', False))
-        successful_enhanced = sum(1 for r in self.test_results if r['enhanced_result'] and r['enhanced_result'].get('success', False))
+        # Accumulate every statistic in a single pass over the results
+        total_tests = 0
+        successful_legacy = successful_enhanced = 0
+        sum_legacy_conf = sum_enhanced_conf = sum_time = 0.0
+        count_legacy_conf = count_enhanced_conf = count_time = 0
         
-        logger.info(f"Total tests: {total_tests}")
-        logger.info(f"Legacy OCR success rate: {successful_legacy}/{total_tests} ({successful_legacy/total_tests*100:.1f}%)")
-        logger.info(f"Enhanced OCR success rate: {successful_enhanced}/{total_tests} ({successful_enhanced/total_tests*100:.1f}%)")
+        for r in self.test_results:
+            total_tests += 1
+            legacy = r['legacy_result']
+            enhanced = r['enhanced_result']
+            
+            if legacy:
+                successful_legacy += bool(legacy.get('success', False))
+                sum_legacy_conf += legacy.get('confidence_score', 0)
+                count_legacy_conf += 1
+            
+            if enhanced:
+                successful_enhanced += bool(enhanced.get('success', False))
+                sum_enhanced_conf += enhanced.get('confidence_score', 0)
+                count_enhanced_conf += 1
+                time_taken = enhanced.get('enhanced_features', {}).get('processing_time', 0)
+                if time_taken > 0:
+                    sum_time += time_taken
+                    count_time += 1
         
-        # Average confidence scores
-        legacy_confidences = [r['legacy_result'].get('confidence_score', 0) for r in self.test_results if r['legacy_result']]
-        enhanced_confidences = [r['enhanced_result'].get('confidence_score', 0) for r in self.test_results if r['enhanced_result']]
+        logger.info("Total tests: %s", total_tests)
+        logger.info("Legacy OCR success rate: %s/%s (%.1f%%)", successful_legacy, total_tests, successful_legacy/total_tests*100)
+        logger.info("Enhanced OCR success rate: %s/%s (%.1f%%)", successful_enhanced, total_tests, successful_enhanced/total_tests*100)
         
-        if legacy_confidences:
-            avg_legacy_conf = sum(legacy_confidences) / len(legacy_confidences)
-            logger.info(f"Average legacy confidence: {avg_legacy_conf:.3f}")
+        # Average confidence scores
+        if count_legacy_conf:
+            avg_legacy_conf = sum_legacy_conf / count_legacy_conf
+            logger.info("Average legacy confidence: %.3f", avg_legacy_conf)
         
-        if enhanced_confidences:
-            avg_enhanced_conf = sum(enhanced_confidences) / len(enhanced_confidences)
-            logger.info(f"Average enhanced confidence: {avg_enhanced_conf:.3f}")
+        if count_enhanced_conf:
+            avg_enhanced_conf = sum_enhanced_conf / count_enhanced_conf
+            logger.info("Average enhanced confidence: %.3f", avg_enhanced_conf)
         
         # Processing times
-        processing_times = []
-        for result in self.test_results:
-            if result['enhanced_result']:
-                time_taken = result['enhanced_result'].get('enhanced_features', {}).get('processing_time', 0)
-                if time_taken > 0:
-                    processing_times.append(time_taken)
-        
-        if processing_times:
-            avg_time = sum(processing_times) / len(processing_times)
-            logger.info(f"Average processing time: {avg_time:.2f} seconds")
+        if count_time:
+            avg_time = sum_time / count_time
+            logger.info("Average processing time: %.2f seconds", avg_time)
 
 def main():
     """Main test function"""
@@ -344,7 +389,7 @@ def main():
     except KeyboardInterrupt:
         logger.info("\nTest suite interrupted by user")
     except Exception as e:
-        logger.error(f"\nTest suite failed with error: {e}")
+        logger.error("\nTest suite failed with error: %s", e)
 
 if __name__ == "__main__":
     main()
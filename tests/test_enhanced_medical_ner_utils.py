@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the enhanced medical NER helpers
+"""
+
+import unittest
+from pathlib import Path
+import sys
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.ml_pipeline.enhanced_medical_ner_utils import _top_matches, extract_with_fuzzy_matching
+
+DRUG_NAMES = [
+    'paracetamol', 'paracetamal', 'crocin', 'dolo', 'calpol',
+    'amoxicillin', 'amoxil', 'mox', 'azithromycin', 'azee',
+    'metformin', 'glycomet', 'cetirizine', 'cetzine', 'okacet',
+]
+
+class TestTopMatches(unittest.TestCase):
+    def assert_matches_extract(self, queries, choices, scorer, limit, cutoff):
+        """_top_matches over a cdist row must pick what process.extract picks, in order"""
+        scores = process.cdist(queries, choices, scorer=scorer,
+                               score_cutoff=cutoff, dtype=np.float64)
+        for query, row in zip(queries, scores):
+            with self.subTest(query=query, limit=limit, cutoff=cutoff):
+                expected = process.extract(query, choices, scorer=scorer,
+                                           limit=limit, score_cutoff=cutoff)
+                actual = _top_matches(row, limit, cutoff)
+                self.assertEqual(actual, [index for _, _, index in expected])
+                self.assertEqual([float(row[index]) for index in actual],
+                                 [score for _, score, _ in expected])
+
+    def test_single_words(self):
+        """Test word candidates scored with fuzz.ratio"""
+        words = ['paracetmol', 'amoxcillin', 'azithro', 'metfornin', 'dolo', 'xyzzy']
+        for cutoff in (0, 50, 80):
+            self.assert_matches_extract(words, DRUG_NAMES, fuzz.ratio, 3, cutoff)
+
+    def test_multi_word_phrases(self):
+        """Test phrase candidates scored with fuzz.partial_ratio"""
+        phrases = ['tab paracetamol 500mg', 'cap amoxicillin bd', 'take azee once', 'after food daily']
+        for cutoff in (0, 60, 80):
+            self.assert_matches_extract(phrases, DRUG_NAMES, fuzz.partial_ratio, 2, cutoff)
+
+    def test_ties_keep_vocabulary_order(self):
+        """Test that equal scores are ordered by position in the vocabulary"""
+        choices = ['abx', 'aby', 'abz', 'abw', 'zzz']
+        self.assert_matches_extract(['abq'], choices, fuzz.ratio, 3, 0)
+        self.assertEqual(_top_matches(np.array([50.0, 70.0, 70.0, 50.0]), 3, 0), [1, 2, 0])
+
+    def test_duplicate_choices(self):
+        """Test that a name listed twice is returned at both positions"""
+        choices = ['dolo', 'crocin', 'dolo']
+        self.assert_matches_extract(['dolo'], choices, fuzz.ratio, 3, 0)
+
+    def test_cutoff_boundary_is_inclusive(self):
+        """Test that a score exactly equal to the default 80 cutoff is kept"""
+        choices = ['dolox', 'doloxy', 'crocin']
+        self.assertEqual(fuzz.ratio('dolor', 'dolox'), 80.0)
+        for cutoff in (80.0, 80.001):
+            self.assert_matches_extract(['dolor'], choices, fuzz.ratio, 3, cutoff)
+
+        row = process.cdist(['dolor'], choices, scorer=fuzz.ratio,
+                            score_cutoff=80.0, dtype=np.float64)[0]
+        self.assertEqual(_top_matches(row, 3, 80.0), [0])
+
+    def test_fractional_cutoff_matches_extract(self):
+        """Test a cutoff equal to a non-representable score, e.g. threshold * 100 rounding"""
+        boundary = fuzz.ratio('paracetmol', 'paracetamal')
+        self.assert_matches_extract(['paracetmol'], DRUG_NAMES, fuzz.ratio, 3, boundary)
+
+    def test_limit_larger_than_vocabulary(self):
+        """Test that a limit beyond the vocabulary size returns every passing name"""
+        choices = ['dolo', 'crocin', 'calpol']
+        self.assert_matches_extract(['dolo'], choices, fuzz.ratio, 10, 0)
+        self.assert_matches_extract(['dolo'], choices, fuzz.ratio, 10, 50)
+        self.assertEqual(len(_top_matches(np.array([90.0, 10.0]), 10, 0)), 2)
+
+class TestFuzzyMatchingExtraction(unittest.TestCase):
+    def test_misspelled_drug_is_found(self):
+        """Test end to end that an OCR-misspelled drug maps to its generic name"""
+        drug_database = {
+            'paracetamol': {'variations': ['crocin', 'dolo'], 'generic_name': 'paracetamol', 'category': 'analgesic'},
+            'amoxicillin': {'variations': ['amoxil', 'mox'], 'generic_name': 'amoxicillin', 'category': 'antibiotic'},
+        }
+        entities = extract_with_fuzzy_matching('Tab Paracetmol 500mg bd', drug_database, threshold=0.8)
+
+        words = [m for m in entities['medications'] if m['method'] == 'rapidfuzz']
+        self.assertTrue(any(m['generic_name'] == 'paracetamol' for m in words))
+        self.assertTrue(all(m['confidence'] >= 0.8 for m in entities['medications']))
+
+if __name__ == '__main__':
+    unittest.main()
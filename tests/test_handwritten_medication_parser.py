@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the handwritten medication parser
+"""
+
+import unittest
+from unittest import mock
+from pathlib import Path
+import sys
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.ml_pipeline.handwritten_medication_parser import HandwrittenMedicationParser
+
+class TestMedicationMatchCache(unittest.TestCase):
+    def setUp(self):
+        self.parser = HandwrittenMedicationParser()
+
+    def test_repeated_word_is_looked_up_once(self):
+        """Test that a cached word skips the fuzzy lookup"""
+        with mock.patch.object(self.parser, '_lookup_medication',
+                               wraps=self.parser._lookup_medication) as lookup:
+            first = self.parser._find_medication_match('mupirocin')
+            second = self.parser._find_medication_match('mupirocin')
+
+        self.assertEqual(lookup.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first[0], 'mupirocin')
+
+    def test_misses_are_cached(self):
+        """Test that words with no match are cached as None"""
+        with mock.patch.object(self.parser, '_lookup_medication', return_value=None) as lookup:
+            self.assertIsNone(self.parser._find_medication_match('xyzzy'))
+            self.assertIsNone(self.parser._find_medication_match('xyzzy'))
+
+        self.assertEqual(lookup.call_count, 1)
+
+    def test_words_are_normalized_before_caching(self):
+        """Test that case and surrounding whitespace share one cache entry"""
+        with mock.patch.object(self.parser, '_lookup_medication',
+                               wraps=self.parser._lookup_medication) as lookup:
+            results = [
+                self.parser._find_medication_match(word)
+                for word in ('Mupirocin', '  mupirocin ', 'MUPIROCIN\n')
+            ]
+
+        lookup.assert_called_once_with('mupirocin')
+        self.assertEqual(list(self.parser._match_cache), ['mupirocin'])
+        self.assertTrue(all(result == results[0] for result in results))
+
+    def test_full_cache_is_cleared_before_insert(self):
+        """Test that the bounded cache still returns the fresh result"""
+        with mock.patch.object(HandwrittenMedicationParser, 'MATCH_CACHE_SIZE', 2):
+            for word in ('alpha', 'beta'):
+                self.parser._find_medication_match(word)
+            result = self.parser._find_medication_match('mupirocin')
+
+        self.assertEqual(result[0], 'mupirocin')
+        self.assertEqual(list(self.parser._match_cache), ['mupirocin'])
+
+class TestDosagePatterns(unittest.TestCase):
+    def test_instances_do_not_share_pattern_list(self):
+        """Test that changing one parser's patterns leaves others untouched"""
+        first = HandwrittenMedicationParser()
+        second = HandwrittenMedicationParser()
+        first.dosage_patterns.clear()
+
+        self.assertEqual(len(second.dosage_patterns), len(HandwrittenMedicationParser.DOSAGE_PATTERNS))
+
+    def test_compiled_patterns_ignore_case(self):
+        """Test that the precompiled dosage patterns keep IGNORECASE"""
+        parser = HandwrittenMedicationParser()
+        self.assertTrue(any(pattern.search('500MG') for pattern in parser.dosage_patterns))
+        self.assertTrue(any(pattern.search('10 Ml') for pattern in parser.dosage_patterns))
+
+if __name__ == '__main__':
+    unittest.main()
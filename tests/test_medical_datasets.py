@@ -6,6 +6,8 @@ Tests for medical dataset integration
 import unittest
 import tempfile
 import shutil
+import gzip
+import json
 from pathlib import Path
 import sys
 
@@ -18,13 +20,21 @@ from app.ml_pipeline.medical_dataset_creator import MedicalDatasetCreator
 from app.ml_pipeline.handwriting_specialist import HandwritingSpecialist
 
 class TestMedicalDatasets(unittest.TestCase):
-    def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
-        self.dataset_manager = DatasetManager(self.temp_dir)
-        self.dataset_creator = MedicalDatasetCreator(self.dataset_manager)
+    @classmethod
+    def setUpClass(cls):
+        # Loading the specialist's OCR helpers and vocabularies is the slow
+        # part of this suite; build it once and share it across tests
+        cls.specialist = HandwritingSpecialist()
+        
+        # One dataset directory for the class; tests that write files into
+        # it remove them again so the tests stay independent
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.dataset_manager = DatasetManager(cls.temp_dir)
+        cls.dataset_creator = MedicalDatasetCreator(cls.dataset_manager)
     
-    def tearDown(self):
-        shutil.rmtree(self.temp_dir)
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir)
     
     def test_synthetic_sample_creation(self):
         """Test synthetic medical sample creation"""
@@ -34,13 +44,21 @@ class TestMedicalDatasets(unittest.TestCase):
         self.assertTrue(all('text' in sample for sample in samples))
         self.assertTrue(all('category' in sample for sample in samples))
     
+    def test_load_samples_reads_gzip(self):
+        """Test loading compressed sample metadata"""
+        samples = [{'text': 'paracetamol', 'category': 'analgesics'}]
+        samples_file = Path(self.temp_dir) / "medical_samples.json.gz"
+        with gzip.open(samples_file, 'wt') as f:
+            json.dump(samples, f)
+        self.addCleanup(samples_file.unlink)
+        
+        self.assertEqual(self.dataset_manager.load_samples(), samples)
+    
     def test_handwriting_specialist_enhancement(self):
         """Test handwriting specialist with medical context"""
-        specialist = HandwritingSpecialist()
-        
         # Test medical context enhancement
         test_text = "paracetamol 500mg twice daily"
-        enhanced = specialist.enhance_with_medical_context(test_text)
+        enhanced = self.specialist.enhance_with_medical_context(test_text)
         
         self.assertIsInstance(enhanced, str)
         self.assertIn("paracetamol", enhanced.lower())